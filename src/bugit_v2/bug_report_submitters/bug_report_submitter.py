@@ -47,6 +47,12 @@ class BugReportSubmitter[TAuth](abc.ABC):
     # Whether this concrete submitter can safely upload all attachments in
     # parallel. If false, attachments will be uploaded sequentially
     allow_parallel_upload: bool = False
+    # Max number of attachments uploaded at the same time. The rest wait in
+    # a queue. Only applies if allow_parallel_upload is true
+    max_parallel_uploads: int = 4
+    # Whether small attachments should be packed into a single .tar.gz and
+    # uploaded together. Useful if each upload_attachment call is expensive
+    bundle_small_attachments: bool = False
 
     @abc.abstractmethod
     def submit(
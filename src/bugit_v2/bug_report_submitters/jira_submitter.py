@@ -39,6 +39,44 @@ class JiraBasicAuth:
     token: str
 
 
+# credentials that are known to be in each cache file, because this process
+# either wrote or read them. Lets the cache write be skipped without reading
+# the file again
+_known_cached_credentials: dict[str, JiraBasicAuth] = {}
+
+
+def read_cached_jira_credentials(submitter_name: str) -> JiraBasicAuth | None:
+    """Reads the credentials cached by cache_jira_credentials
+
+    :param submitter_name: name of the submitter that cached the credentials
+    :return: the credentials, or None if nothing valid was cached
+    """
+    cache_file = f"/tmp/{submitter_name}-credentials.json"
+    try:
+        with open(cache_file) as f:
+            auth_json = json.load(f)
+            auth = JiraBasicAuth(auth_json["email"], auth_json["token"])
+    except Exception:
+        return None
+    _known_cached_credentials[cache_file] = auth
+    return auth
+
+
+def cache_jira_credentials(submitter_name: str, auth: JiraBasicAuth) -> None:
+    """Saves the credentials to /tmp. Skips the write if the file already
+    has the same credentials
+
+    :param submitter_name: name of the submitter, used in the file name
+    :param auth: the credentials to save
+    """
+    cache_file = f"/tmp/{submitter_name}-credentials.json"
+    if _known_cached_credentials.get(cache_file) == auth:
+        return
+    with open(cache_file, "w") as f:
+        json.dump(asdict(auth), f)
+    _known_cached_credentials[cache_file] = auth
+
+
 @final
 class JiraAuthModal(ModalScreen[tuple[JiraBasicAuth, bool] | None]):
     auth: JiraBasicAuth | None = None
@@ -214,8 +252,7 @@ class JiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
                     validate=True,
                 )
                 if self.allow_cache_credentials:
-                    with open(f"/tmp/{self.name}-credentials.json", "w") as f:
-                        json.dump(asdict(self.auth), f)
+                    cache_jira_credentials(self.name, self.auth)
             self.jira.issue(bug_id)
             return True
         except JIRAError as e:
@@ -275,8 +312,7 @@ class JiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
 
         # immediately cache
         if self.allow_cache_credentials:
-            with open(f"/tmp/{self.name}-credentials.json", "w") as f:
-                json.dump(asdict(self.auth), f)
+            cache_jira_credentials(self.name, self.auth)
         yield AdvanceMessage(
             "Jira auth is valid"
             + (
@@ -309,12 +345,7 @@ class JiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
 
     @override
     def get_cached_credentials(self) -> JiraBasicAuth | None:
-        try:
-            with open(f"/tmp/{self.name}-credentials.json") as f:
-                auth_json = json.load(f)
-                return JiraBasicAuth(auth_json["email"], auth_json["token"])
-        except Exception:
-            return None
+        return read_cached_jira_credentials(self.name)
 
     @override
     def upload_attachment(
@@ -1,9 +1,7 @@
-import json
 import os
 import random
 import time
 from collections.abc import Generator, Mapping, Sequence
-from dataclasses import asdict
 from pathlib import Path
 from typing import cast, final, override
 
@@ -18,6 +16,8 @@ from bugit_v2.bug_report_submitters.jira_submitter import (
     JiraAuthModal,
     JiraBasicAuth,
     JiraSubmitterError,
+    cache_jira_credentials,
+    read_cached_jira_credentials,
 )
 from bugit_v2.models.bug_report import BugReport, Severity
 
@@ -99,8 +99,7 @@ class MockJiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
                     validate=True,
                 )
                 if self.allow_cache_credentials:
-                    with open(f"/tmp/{self.name}-credentials.json", "w") as f:
-                        json.dump(asdict(self.auth), f)
+                    cache_jira_credentials(self.name, self.auth)
             self.jira.issue(bug_id)
             return True
         except JIRAError as e:
@@ -135,8 +134,7 @@ class MockJiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
 
         # immediately cache
         if self.allow_cache_credentials:
-            with open(f"/tmp/{self.name}-credentials.json", "w") as f:
-                json.dump(asdict(self.auth), f)
+            cache_jira_credentials(self.name, self.auth)
         yield AdvanceMessage(
             "Jira auth is valid"
             + (
@@ -173,12 +171,7 @@ class MockJiraSubmitter(BugReportSubmitter[JiraBasicAuth]):
 
     @override
     def get_cached_credentials(self) -> JiraBasicAuth | None:
-        try:
-            with open(f"/tmp/{self.name}-credentials.json") as f:
-                auth_json = json.load(f)
-                return JiraBasicAuth(auth_json["email"], auth_json["token"])
-        except Exception:
-            return None
+        return read_cached_jira_credentials(self.name)
 
     @override
     def upload_attachment(self, attachment_file: Path, filename: str | None = None) -> str | None:
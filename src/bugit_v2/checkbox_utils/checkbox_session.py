@@ -26,12 +26,15 @@ def get_valid_sessions() -> list[Path]:
     if not SESSION_ROOT_DIR.exists():
         return []
     valid_session_dirs: list[Path] = []
-    for d in os.listdir(SESSION_ROOT_DIR):
-        try:
-            if len(os.listdir(SESSION_ROOT_DIR / d / "io-logs")) != 0:
-                valid_session_dirs.append(SESSION_ROOT_DIR / d)
-        except (FileNotFoundError, NotADirectoryError):
-            continue
+    with os.scandir(SESSION_ROOT_DIR) as session_dirs:
+        for d in session_dirs:
+            try:
+                # 1 entry is enough to know it's not empty, don't list all of them
+                with os.scandir(os.path.join(d.path, "io-logs")) as io_logs:
+                    if next(io_logs, None) is not None:
+                        valid_session_dirs.append(Path(d.path))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
     return valid_session_dirs
 
 
@@ -11,15 +11,17 @@ import importlib.resources
 import logging
 import os
 import shutil
+import tarfile
 from collections.abc import Awaitable, Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
+from subprocess import CalledProcessError
 from typing import Callable
 
 
 from bugit_v2.models.bug_report import BugReport, LogName
 from bugit_v2.utils import host_is_ubuntu_core, is_snap
-from bugit_v2.utils.async_subprocess import asp_check_call, asp_check_output
+from bugit_v2.utils.async_subprocess import asp_check_call, asp_check_output, asp_run
 from bugit_v2.utils.constants import MAX_JOB_OUTPUT_LEN
 
 logger = logging.getLogger(__name__)
@@ -59,16 +61,64 @@ class LogCollector:
     hidden: bool = False
 
 
+async def _to_thread_until_done[**P, R](
+    func: Callable[P, R], *args: P.args, **kwargs: P.kwargs
+) -> R:
+    """Same as asyncio.to_thread, but if the caller is cancelled, this waits
+    for the thread to return before re-raising the cancellation.
+
+    The thread itself can't be stopped and it may still be writing into the
+    target dir. Waiting here means a cancelled collector only finishes after
+    it stopped touching the disk, so the caller can safely delete the dir
+    """
+    task = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        _ = await asyncio.wait((task,))
+        raise
+
+
+def _pack_with_tarfile(source_dir: Path, archive: Path) -> None:
+    """Packs source_dir into a .tar.gz file with only the standard library
+
+    :param source_dir: the directory to pack, its contents are at the root
+    :param archive: where to write the .tar.gz file
+    """
+    with tarfile.open(archive, "w:gz") as tar:
+        # add() keeps the owner names and hard links, and skips sockets/fifos
+        tar.add(source_dir, arcname=".")
+
+
 async def pack_checkbox_session(target_dir: Path, bug_report: BugReport) -> str:
     assert (
         bug_report.checkbox_session is not None
     ), "Can't use this collector if there's no checkbox session"
 
-    shutil.make_archive(
-        str(target_dir / "checkbox_session"),
-        root_dir=bug_report.checkbox_session.session_path,
-        format="gztar",
-    )
+    session_path = bug_report.checkbox_session.session_path
+    archive = target_dir / "checkbox_session.tar.gz"
+    if shutil.which("tar") and shutil.which("pigz"):
+        # native tar + pigz compresses on all the cores and doesn't hold the GIL
+        cmd = [
+            "tar",
+            # checkbox may still be writing to the session
+            "--warning=no-file-changed",
+            "-C",
+            str(session_path),
+            "-I",
+            "pigz",
+            "-cf",
+            str(archive),
+            ".",
+        ]
+        rv = await asp_run(cmd)
+        # GNU tar exits with 1 if a file changed while it was being read
+        # the archive is still complete, only 2 means a fatal error
+        if rv.returncode not in (0, 1):
+            raise CalledProcessError(rv.returncode, cmd, rv.stdout, rv.stderr)
+    else:
+        # compressing the session can take a while, don't block the event loop
+        await _to_thread_until_done(_pack_with_tarfile, session_path, archive)
 
     return f"Added checkbox session to {target_dir}"
 
@@ -189,7 +239,11 @@ async def pack_checkbox_submission(target_dir: Path, bug_report: BugReport):
         submission_path.exists()
     ), f"{submission_path} was deleted after the bug report was created!"
 
-    shutil.copyfile(submission_path, target_dir / os.path.basename(submission_path))
+    await _to_thread_until_done(
+        shutil.copyfile,
+        submission_path,
+        target_dir / os.path.basename(submission_path),
+    )
 
     return f"Added checkbox submission to {target_dir}"
 
@@ -207,7 +261,10 @@ async def long_job_outputs(target_dir: Path, bug_report: BugReport):
         bug_report.checkbox_session.session_path.exists()
     ), f"{bug_report.checkbox_session.session_path} was deleted after the bug report was created!"
 
-    job_output = bug_report.checkbox_session.get_job_output(bug_report.job_id)
+    # this reads through the entire session file
+    job_output = await _to_thread_until_done(
+        bug_report.checkbox_session.get_job_output, bug_report.job_id
+    )
 
     assert (
         job_output
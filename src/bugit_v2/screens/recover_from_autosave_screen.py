@@ -133,10 +133,12 @@ class RecoverFromAutoSaveScreen(Screen[SerializableBugReport | None]):
                         )
 
             with VerticalScroll(classes="w100 center"):
+                # all the relative timestamps are against the same time
+                now = datetime.datetime.now()
                 for filename in self.valid_autosave_data.keys():
                     with HorizontalGroup(classes="center row"):
                         yield Button(
-                            self._button_text(filename),
+                            self._button_text(filename, now),
                             name=filename,  # can't have slashes in id
                             flat=True,
                             classes="session_button mr1 ha",
@@ -184,7 +186,7 @@ class RecoverFromAutoSaveScreen(Screen[SerializableBugReport | None]):
         else:
             self.dismiss(self.valid_autosave_data[event.button.name])
 
-    def _button_text(self, filename: str) -> Content:
+    def _button_text(self, filename: str, now: datetime.datetime) -> Content:
         assert filename in self.valid_autosave_data
         autosave = self.valid_autosave_data[filename]
         lines: list[str] = []
@@ -194,7 +196,8 @@ class RecoverFromAutoSaveScreen(Screen[SerializableBugReport | None]):
                 + pretty_date(
                     datetime.datetime.fromtimestamp(
                         os.stat(self.autosave_dir / filename).st_ctime
-                    )
+                    ),
+                    now,
                 ),
             )
         else:
@@ -1,7 +1,14 @@
+import asyncio
 import enum
 import logging
+import os
+import queue
 import shutil
+import tarfile
+import threading
 import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tempfile import mkdtemp
 from typing import Final, Literal, final
@@ -14,7 +21,7 @@ from textual.reactive import var
 from textual.screen import Screen
 from textual.timer import Timer
 from textual.widgets import Button, Footer, Label, ProgressBar, RichLog
-from textual.worker import Worker, WorkerState
+from textual.worker import Worker, WorkerError, WorkerState
 from typing_extensions import override
 
 from bugit_v2.bug_report_submitters.bug_report_submitter import (
@@ -23,7 +30,7 @@ from bugit_v2.bug_report_submitters.bug_report_submitter import (
 )
 from bugit_v2.components.confirm_dialog import ConfirmScreen
 from bugit_v2.components.header import SimpleHeader
-from bugit_v2.dut_utils.log_collectors import LOG_NAME_TO_COLLECTOR
+from bugit_v2.dut_utils.log_collectors import LOG_NAME_TO_COLLECTOR, LogCollector
 from bugit_v2.models.bug_report import BugReport, LogName
 from bugit_v2.utils import is_prod, is_snap, slugify
 from bugit_v2.utils.constants import HOST_FS
@@ -32,11 +39,30 @@ logger = logging.getLogger(__name__)
 
 ReturnScreenChoice = Literal["job", "session", "quit", "report_editor"]
 RETURN_SCREEN_CHOICES: tuple[ReturnScreenChoice, ...] = ReturnScreenChoice.__args__
+# files up to this size are packed together if the submitter asks for it
+SMALL_ATTACHMENT_SIZE: Final = 5 * 10**6  # 5mb
+# how often the queued log messages and progress are pushed to the widgets
+UI_UPDATE_INTERVAL: Final = 0.1
+# a burst of messages (e.g. many collectors failing at once) is spread over
+# a few ticks instead of freezing the UI for one long tick
+MAX_LOG_LINES_PER_FLUSH: Final = 64
+FINAL_WORKER_STATES: Final = frozenset(
+    (WorkerState.SUCCESS, WorkerState.ERROR, WorkerState.CANCELLED)
+)
+# collectors that usually take the longest, they are launched before the others
+LAUNCH_FIRST: Final[frozenset[LogName]] = frozenset(("checkbox-session",))
+# subdirectory of attachment_dir that holds the user selected files
+# each log collector writes to a subdirectory named after the collector
+ADDITIONAL_FILES_DIR: Final = "additional-files"
 
 
 class WorkerName(enum.StrEnum):
     BUG_CREATION = enum.auto()
-    SEQUENTIAL_UPLOAD = enum.auto()
+
+
+class WorkerGroup(enum.StrEnum):
+    COLLECTORS = enum.auto()
+    UPLOADS = enum.auto()
 
 
 @final
@@ -50,16 +76,42 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
     finished = var(False)
 
     attachment_workers: dict[LogName, Worker[str | None]]
-    attachment_worker_checker_timers: dict[str, Timer]
-    upload_workers: dict[str, Worker[str | None]]
+    # prints the collectors that are still running every 30 seconds
+    collector_status_timer: Timer | None = None
+    # snapshot of attachment_workers' keys, taken after all collectors launched
+    # the worker state handler checks this on every state change
+    collector_names: frozenset[str] = frozenset()
+    upload_workers: dict[str, Worker[None]]
+    upload_executor: ThreadPoolExecutor
+    # directories under attachment_dir that were already given to the uploaders
+    queued_attachment_dirs: set[Path]
     bug_creation_worker: Worker[None] | None = None
     finalize_worker: Worker[None] | None = None
 
     progress_start_time: float
 
     attachment_dir: Path
+    # where attachment_dir can be found outside of the snap's private /tmp
+    host_attachment_dir: Path
+    # private scratch dir for the small file bundles, created on first use
+    # the bundles are never written into attachment_dir, it may belong to the caller
+    bundle_dir: Path | None = None
     log_widget: RichLog | None = None  # late init in on_mount
+    progress_bar: ProgressBar | None = None  # late init in on_mount
+    give_up_button: Button | None = None  # late init in on_mount
+    menu_after_finish: VerticalGroup | None = None  # late init in on_mount
+    finish_message: Label | None = None  # late init in on_mount
+    # messages waiting to be written to log_widget
+    log_queue: queue.SimpleQueue[str]
+    # number of steps finished since the last progress bar update
+    pending_progress = 0
+    pending_progress_lock: threading.Lock
+    # true when the files from all the collectors have been queued for upload
     upload_attempted = False
+    # number of workers that haven't reached a final state yet
+    # updated in on_worker_state_changed so is_finished doesn't scan the workers
+    pending_collectors = 0
+    pending_uploads = 0
 
     submitter: Final[BugReportSubmitter[TAuth]]
     # handles the special case for bugit.submit
@@ -99,24 +151,96 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
         if attachment_dir and attachment_dir.exists() and attachment_dir.is_dir():
             self.attachment_dir = attachment_dir
         else:
-            self.attachment_dir = Path(mkdtemp()).expanduser().absolute()
+            # mkdtemp already returns an absolute path
+            # BUGIT_TMPDIR can point the staging dir at faster storage
+            tmp_root = os.getenv("BUGIT_TMPDIR") or None
+            try:
+                self.attachment_dir = Path(mkdtemp(prefix="bugit-", dir=tmp_root))
+            except OSError as e:
+                if tmp_root is None:
+                    raise e
+                logger.warning(
+                    f"Can't create the attachment dir in BUGIT_TMPDIR={tmp_root}, "
+                    + f"using the default temp dir instead. Error: {e}"
+                )
+                self.attachment_dir = Path(mkdtemp(prefix="bugit-"))
+
+        if is_snap() and self.attachment_dir.is_relative_to("/tmp"):
+            self.host_attachment_dir = (
+                Path("/tmp/snap-private-tmp")
+                / f"snap.{os.environ.get('SNAP_INSTANCE_NAME', 'bugit')}"
+                / "tmp"
+                / self.attachment_dir.relative_to("/tmp")
+            )
+        else:
+            self.host_attachment_dir = self.attachment_dir
 
         self.attachment_workers = {}
-        self.attachment_worker_checker_timers = {}
         self.upload_workers = {}
-        self.progress_start_time = time.time()  # doesn't have to precise
+        self.queued_attachment_dirs = set()
+        self.log_queue = queue.SimpleQueue()
+        self.pending_progress_lock = threading.Lock()
+        # one thread per file opens way too many connections at once when
+        # there are a lot of attachments, cap the number of active uploads
+        # and let the rest wait in the executor's queue
+        self.upload_executor = ThreadPoolExecutor(
+            max_workers=(
+                self._get_max_parallel_uploads()
+                if submitter.allow_parallel_upload
+                else 1
+            ),
+            thread_name_prefix="bugit-upload",
+        )
+        self.progress_start_time = time.monotonic()
 
         super().__init__(name, id, classes)
 
+    def _get_max_parallel_uploads(self) -> int:
+        """Max number of uploads at the same time.
+        BUGIT_MAX_CONCURRENT_UPLOADS overrides the submitter's default
+        """
+        default = self.submitter.max_parallel_uploads
+        env_value = os.getenv("BUGIT_MAX_CONCURRENT_UPLOADS")
+        if not env_value:
+            return default
+        try:
+            value = int(env_value)
+        except ValueError:
+            value = 0
+        if value <= 0:
+            logger.warning(
+                f"BUGIT_MAX_CONCURRENT_UPLOADS={env_value} is not a positive "
+                + f"integer, using the default ({default}) instead"
+            )
+            return default
+        return value
+
     @work
     async def on_mount(self) -> None:
         self.log_widget = self.query_exactly_one("#submission_logs", RichLog)
-        self.query_exactly_one("#menu_after_finish").display = False
+        self.progress_bar = self.query_exactly_one("#progress", ProgressBar)
+        self.set_interval(UI_UPDATE_INTERVAL, self._flush_ui_updates)
+        self.give_up_button = self.query_exactly_one("#give_up", Button)
+        self.menu_after_finish = self.query_exactly_one(
+            "#menu_after_finish", VerticalGroup
+        )
+        self.finish_message = self.query_exactly_one("#finish_message", Label)
+        self.menu_after_finish.display = False
+
+        # only collect logs when it's in the main app
+        # collectors don't need the credentials, let them run while the user
+        # is filling in the auth form
+        if self.mode == "screen":
+            self.start_parallel_log_collection()
+            self.collector_names = frozenset(self.attachment_workers)
 
         if self.submitter.auth_modal:
             # submission screen controls how the credentials are assigned
             try:
-                cached_credentials = self.submitter.get_cached_credentials()
+                # this reads from the disk, don't block the UI
+                cached_credentials = await asyncio.to_thread(
+                    self.submitter.get_cached_credentials
+                )
                 if cached_credentials is None:
                     auth_rv = await self.app.push_screen_wait(
                         self.submitter.auth_modal()
@@ -135,10 +259,13 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                         True,  # if it was saved before,
                         # then allow_cache_credentials is definitely true
                     )
-                # overwrite the old one to avoid counting th_log_with_time time waiting
-                # for the auth modal
-                self.progress_start_time = time.time()
             except AssertionError:
+                # nothing will be submitted, don't keep collecting
+                self.workers.cancel_group(self, WorkerGroup.COLLECTORS)
+                if self.mode == "screen" and is_prod():
+                    # the dir was created by this screen, nobody else needs it
+                    await self._remove_attachment_dir_after_collectors()
+
                 if self.mode == "screen":
                     prompt = ConfirmScreen[ReturnScreenChoice](
                         "[red]Authentication form returned nothing[/]",
@@ -156,9 +283,9 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                 self.dismiss(await self.app.push_screen_wait(prompt))
                 return  # need explicit return here
 
-        # only collect logs when it's in the main app
         if self.mode == "screen":
-            self.start_parallel_log_collection()
+            # the collectors are already running, copy while they work
+            await asyncio.to_thread(self.copy_additional_files)
 
         # auth ready, do the jira/lp steps
         self.bug_creation_worker = self.run_worker(
@@ -177,13 +304,53 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
             if worker.is_running:
                 self._log_with_time(f"Unmount, cancelling uploader [b]{key}[/]")
                 worker.cancel()
+        # drop the queued uploads and don't block the unmount on the running ones
+        # NOTE: an upload that already started can't be interrupted. The
+        # executor's threads are not daemons, so quitting in the middle of an
+        # upload makes python wait for those requests to return before it exits
+        self.upload_executor.shutdown(wait=False, cancel_futures=True)
+        self._remove_bundle_dir()
 
     def start_parallel_log_collection(self) -> None:
         """Launches all log collectors and keep the worker objects
 
         This does NOT wait for them to finish, just launches them
         """
-        progress_bar = self.query_exactly_one("#progress", ProgressBar)
+        # get the log collectors running first
+        # all log collectors are allowed to fail. If they do, write a message
+        # to the screen to tell the user how to get the logs manually
+        # the slow ones go first so they overlap with everything else
+        for log_name in sorted(
+            self.bug_report.logs_to_include, key=lambda n: n not in LAUNCH_FIRST
+        ):
+            collector = LOG_NAME_TO_COLLECTOR[log_name]
+            self.pending_collectors += 1
+            self.attachment_workers[log_name] = self.run_worker(
+                self._run_collect(log_name, collector),
+                name=log_name,
+                group=WorkerGroup.COLLECTORS,
+                exit_on_error=False,  # hold onto the err, don't crash
+            )
+
+            msg = f"Launched collector: {collector.display_name}"
+            if (t := collector.advertised_timeout) is not None:
+                msg += f" (timeout: {t}s)"
+            self._log_with_time(msg)
+
+        self.collector_status_timer = self.set_interval(
+            30, self._report_pending_collectors
+        )
+        self._log_with_time(
+            "[blue]Slow collectors will print a status report every 30 seconds"
+        )
+
+    def copy_additional_files(self) -> None:
+        """Copies the user selected files into the attachment dir
+
+        This blocks, run it in a thread
+        """
+        additional_files_dir = self.attachment_dir / ADDITIONAL_FILES_DIR
+        additional_files_dir.mkdir(exist_ok=True)
 
         # the additional files are also technically "logs"
         # run the workaround in this function, not the uploaders
@@ -200,219 +367,207 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                 else:
                     # something under root, include the entire path and slugify
                     target_file_name = slugify(str(file.parent)) + "_" + file.name
-                shutil.copy(file, self.attachment_dir / target_file_name)
+                shutil.copy(file, additional_files_dir / target_file_name)
             except Exception as e:
-                self._log_with_time(f"[red]Failed to copy {file}: {e}")
+                self._log_with_time(
+                    f"[red]Failed to copy {file}: {escape_markup(str(e))}"
+                )
 
-        # get the log collectors running first
-        # all log collectors are allowed to fail. If they do, write a message
-        # to the screen to tell the user how to get the logs manually
-        for log_name in self.bug_report.logs_to_include:
-
-            async def run_collect(log: LogName):
-                collector = LOG_NAME_TO_COLLECTOR[log]
-                try:
-                    rv = await collector.collect(self.attachment_dir, self.bug_report)
-                    if rv and rv.strip():
-                        # only show non-empty, non-null messages
-                        self._log_with_time(
-                            " ".join(
-                                [
-                                    "[green]OK[/]",
-                                    f"[b]{collector.display_name}[/b]:",
-                                    rv.strip(),
-                                ]
-                            )
-                        )
-                    else:
-                        self._log_with_time(
-                            " ".join(
-                                [
-                                    "[green]OK[/]",
-                                    f"[b]{collector.display_name}[/b]:",
-                                    "Finished collection!",
-                                ]
-                            )
-                        )
-                except Exception as e:
-                    self._log_with_time(
-                        " ".join(
-                            [
-                                f"[red]FAIL[/red] {collector.display_name} failed:",
-                                repr(e),
-                            ]
-                        )
-                    )
-                    if collector.manual_collection_command:
-                        self._log_with_time(
-                            f"You can rerun [blue]{collector.display_name}[/] "
-                            + f"with [blue]{collector.manual_collection_command}[/]"
-                        )
-                finally:
-                    progress_bar.advance()
-
-            def check_if_worker_is_pending(name: LogName):
-                if self.attachment_workers[name].is_running:
-                    msg = LOG_NAME_TO_COLLECTOR[name].display_name + " is still running"
-                    if (t := LOG_NAME_TO_COLLECTOR[name].advertised_timeout) is not None:
-                        msg += f" (timeout: {t}s)"
-                    msg += "..."
-                    self._log_with_time(msg)
-                else:
-                    self.attachment_worker_checker_timers[name].stop()
+    async def _run_collect(self, log_name: LogName, collector: LogCollector) -> None:
+        """Runs a single log collector and reports the result in the log widget
 
-            self.attachment_workers[log_name] = self.run_worker(
-                run_collect(log_name),
-                name=log_name,
-                exit_on_error=False,  # hold onto the err, don't crash
-            )
-            self.attachment_worker_checker_timers[log_name] = self.set_interval(
-                30, lambda n=log_name: check_if_worker_is_pending(n)
+        :param log_name: the collector's name, also the name of its target dir
+        :param collector: the collector to run
+        """
+        try:
+            # each collector gets its own directory so its files can
+            # be uploaded as soon as it finishes
+            target_dir = self.attachment_dir / log_name
+            target_dir.mkdir(exist_ok=True)
+            rv = await collector.collect(target_dir, self.bug_report)
+            self._log_ok(
+                collector.display_name, (rv or "").strip() or "Finished collection!"
             )
+        except Exception as e:
+            self._log_fail(f"{collector.display_name} failed", e)
+            if collector.manual_collection_command:
+                self._log_with_time(
+                    f"You can rerun [blue]{collector.display_name}[/] "
+                    + f"with [blue]{collector.manual_collection_command}[/]"
+                )
+        finally:
+            self._advance_progress()
 
-            display_name = LOG_NAME_TO_COLLECTOR[log_name].display_name
-            msg = f"Launched collector: {display_name}"
-            if (t := LOG_NAME_TO_COLLECTOR[log_name].advertised_timeout) is not None:
+    def _report_pending_collectors(self) -> None:
+        """Prints a line for each collector that's still running.
+        Stops the status timer once all of them are done
+        """
+        running = False
+        for log_name, worker in self.attachment_workers.items():
+            if not worker.is_running:
+                continue
+            running = True
+            collector = LOG_NAME_TO_COLLECTOR[log_name]
+            msg = collector.display_name + " is still running"
+            if (t := collector.advertised_timeout) is not None:
                 msg += f" (timeout: {t}s)"
+            msg += "..."
             self._log_with_time(msg)
 
-        self._log_with_time(
-            "[blue]Slow collectors will print a status report every 30 seconds"
-        )
+        if not running and self.collector_status_timer:
+            self.collector_status_timer.stop()
 
-    def start_parallel_attachment_upload(self) -> None:
-        assert self.log_widget
-        progress_bar = self.query_exactly_one("#progress", ProgressBar)
+    def _upload_one(self, f: Path, bundled_files: Sequence[Path] = ()) -> None:
+        """Uploads a single file. This should be run in self.upload_executor
 
-        def upload_one(f: Path):
-            try:
-                if f.stat().st_size == 0:
-                    self._log_with_time(
-                        f"[orange_red1]WARN[/] {f} is an empty file. Skipping"
-                    )
-                    return
+        :param f: the file to upload
+        :param bundled_files: if not empty, pack these files into f first
+        """
+        try:
+            if bundled_files:
+                # bugit.submit fills the attachment dir with symlinks
+                # pack what they point to, not the links themselves
+                with tarfile.open(f, "w:gz", dereference=True) as tar:
+                    for b in bundled_files:
+                        tar.add(b, arcname=b.name)
+
+            if f.stat().st_size == 0:
+                self._log_with_time(
+                    f"[orange_red1]WARN[/] {f} is an empty file. Skipping"
+                )
+                return
 
-                if not f.is_file():
-                    raise RuntimeError(f"{f} is not a regular file during submission")
+            if not f.is_file():
+                raise RuntimeError(f"{f} is not a regular file during submission")
 
+            self._log_with_time(f"Uploading: {f.name}")
+            if self.submitter.allow_parallel_upload:
                 rv = self.submitter.upload_attachment(f, slugify(str(f.stem)) + f.suffix)
+            else:
+                # sequential submitters (lp, local) have always kept the file name
+                rv = self.submitter.upload_attachment(f)
+            self._log_ok(f"Uploaded {f.name}", rv)
+        except Exception as e:
+            self._log_fail(f"failed to upload {f}", e)
+            raise e  # mark the worker as failed
+        finally:
+            self._advance_progress()
 
-                if rv and rv.strip():
-                    # only show non-empty, non-null messages
-                    self._log_with_time(
-                        f"[green]OK[/] [b]Uploaded {f.name}[/]: {rv.strip()}"
-                    )
-                else:
-                    self._log_with_time(f"[green]OK[/] [b]Uploaded {f.name}[/b]")
-            except Exception as e:
-                self._log_with_time(f"[red]FAIL[/red] failed to upload {f}: {repr(e)}")
-                raise e  # mark the worker as failed
-            finally:
-                progress_bar.advance()
-
-        for file in self.attachment_dir.iterdir():
-            self.upload_workers[str(file)] = self.run_worker(
-                # closure workaround
-                # https://stackoverflow.com/a/1107260
-                # bind the value early
-                lambda f=file: upload_one(f),
-                thread=True,  # not async
-                exit_on_error=False,  # hold onto the err, don't crash
-            )
-            self._log_with_time(f"Uploading: {file.name}")
+    async def _upload_in_executor(
+        self, f: Path, bundled_files: Sequence[Path] = ()
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            self.upload_executor, self._upload_one, f, bundled_files
+        )
 
-    def start_sequential_attachment_upload(self) -> None:
-        assert self.log_widget
-        progress_bar = self.query_exactly_one("#progress", ProgressBar)
-
-        def upload_all():
-            failed_attachments: list[str] = []
-            for f in self.attachment_dir.iterdir():
-                try:
-                    if f.stat().st_size == 0:
-                        self._log_with_time(
-                            f"[orange_red1]WARN[/] {f} is an empty file. Skipping"
-                        )
-                        continue
+    def upload_finished_attachments(self) -> None:
+        """Queues the files of all the finished collectors for upload
 
-                    self._log_with_time(f"Uploading: {f.name}")
-                    rv = self.submitter.upload_attachment(f)
+        Each collector writes to its own directory, so its files are complete
+        as soon as it finishes. They don't have to wait for slower collectors.
+        Does nothing until the bug has been created.
+        """
+        if (
+            self.bug_creation_worker is None
+            or self.bug_creation_worker.state != WorkerState.SUCCESS
+        ):
+            return
 
-                    if rv and rv.strip():
-                        # only show non-empty, non-null messages
-                        self._log_with_time(
-                            f"[green]OK[/] [b]Uploaded {f.name}[/]: {rv.strip()}"
-                        )
-                    else:
-                        self._log_with_time(f"[green]OK[/] [b]Uploaded {f.name}[/b]")
-                except Exception as e:
-                    failed_attachments.append(f.name)
-                    self._log_with_time(
-                        f"[red]FAIL[/red] failed to upload {f}: {repr(e)}"
+        # the attachment dir itself may have files when the attachments were
+        # prepared outside of this screen (bugit.submit)
+        ready_dirs = [self.attachment_dir, self.attachment_dir / ADDITIONAL_FILES_DIR]
+        ready_dirs.extend(
+            self.attachment_dir / log_name
+            for log_name, worker in self.attachment_workers.items()
+            if worker.is_finished
+        )
+
+        for d in ready_dirs:
+            if d in self.queued_attachment_dirs or not d.is_dir():
+                continue
+            self.queued_attachment_dirs.add(d)
+            with os.scandir(d) as it:
+                # collector dirs are queued separately
+                entries = [e for e in it if not e.is_dir()]
+
+            if self.submitter.bundle_small_attachments:
+                small_entries = [
+                    e for e in entries if 0 < e.stat().st_size <= SMALL_ATTACHMENT_SIZE
+                ]
+                if len(small_entries) > 1:
+                    if self.bundle_dir is None:
+                        self.bundle_dir = Path(mkdtemp(prefix="bugit-bundles-"))
+                    source_name = "attachments" if d == self.attachment_dir else d.name
+                    self._queue_upload(
+                        self.bundle_dir / f"{source_name}-small-files.tar.gz",
+                        [Path(e.path) for e in small_entries],
                     )
-                finally:
-                    progress_bar.advance()
+                    entries = [e for e in entries if e not in small_entries]
 
-            if len(failed_attachments) != 0:
-                # force an error here to mark the worker as failed
-                raise RuntimeError(
-                    f"These attachments failed to upload: {', '.join(failed_attachments)}"
-                )
+            for entry in entries:
+                self._queue_upload(Path(entry.path))
+
+        if self.pending_collectors == 0:
+            self.upload_attempted = True
+            assert self.give_up_button
+            self.give_up_button.disabled = True
+            self.give_up_button.label = "All collectors finished"
+            self.give_up_button.styles.width = "auto"
+
+        # assume 1 file for each collector that's still running
+        assert self.progress_bar
+        self.progress_bar.total = (
+            self.submitter.steps
+            + len(self.attachment_workers)
+            + len(self.upload_workers)
+            + self.pending_collectors
+        )
 
-        self.upload_workers[WorkerName.SEQUENTIAL_UPLOAD] = self.run_worker(
-            upload_all,
-            name=WorkerName.SEQUENTIAL_UPLOAD,  # just for completeness
-            thread=True,  # not async
+    def _queue_upload(self, f: Path, bundled_files: Sequence[Path] = ()) -> None:
+        self.pending_uploads += 1
+        self.upload_workers[str(f)] = self.run_worker(
+            self._upload_in_executor(f, bundled_files),
+            name=str(f),
+            group=WorkerGroup.UPLOADS,
             exit_on_error=False,  # hold onto the err, don't crash
         )
+        if bundled_files:
+            self._log_with_time(
+                f"Queued for upload: {f.name} "
+                + f"({', '.join(b.name for b in bundled_files)})"
+            )
+        else:
+            self._log_with_time(f"Queued for upload: {f.name}")
 
     def create_bug(self) -> None:
         """Do the entire bug creation sequence. This should be run in a worker"""
-        assert self.log_widget
-
-        progress_bar = self.query_exactly_one("#progress", ProgressBar)
-        display_name = self.submitter.display_name or self.submitter.name
+        log_prefix = f"[b]{self.submitter.display_name or self.submitter.name}[/b]:"
+        ok_prefix = f"[green]OK[/] {log_prefix}"
 
         for step_result in self.submitter.submit(self.bug_report):
             match step_result:
                 case str():
                     # general logs
-                    self._log_with_time(f"[b]{display_name}[/b]: {step_result}")
+                    self._log_with_time(f"{log_prefix} {step_result}")
                 case AdvanceMessage():
                     # messages that will advance the progress bar
-                    self._log_with_time(
-                        f"[green]OK[/] [b]{display_name}[/b]: " + step_result.message
-                    )
-                    progress_bar.advance()
+                    self._log_with_time(f"{ok_prefix} {step_result.message}")
+                    self._advance_progress()
 
-        running_collectors = [
-            w for w in self.attachment_workers.values() if w.is_running
+        running_collectors: list[LogName] = [
+            log_name for log_name, w in self.attachment_workers.items() if w.is_running
         ]
-        num_attachments = sum(1 for _ in self.attachment_dir.iterdir())
         if len(running_collectors) > 0:
             self._log_with_time(
                 f"[blue]Finished bug creation. Waiting for {len(running_collectors)} log collector(s) to finish"
             )
             self._log_with_time(
-                f"[blue]{num_attachments} attachment(s) will start to upload after they are done"
+                "[blue]Their files will start to upload as soon as each of them is done"
             )
-            for c in running_collectors:
-                if c.name in LOG_NAME_TO_COLLECTOR:
-                    display_name = LOG_NAME_TO_COLLECTOR[
-                        c.name  # pyright can't infer this yet
-                    ].display_name  # pyright: ignore[reportArgumentType]
-                    self._log_with_time(
-                        f" - {display_name}",
-                    )
+            for log_name in running_collectors:
+                self._log_with_time(f" - {LOG_NAME_TO_COLLECTOR[log_name].display_name}")
         else:
-            if num_attachments > 0:
-                self._log_with_time(
-                    f"[blue]Finished bug creation, uploading {num_attachments} attachment(s)..."
-                )
-            else:
-                self._log_with_time(
-                    "[blue]Finished bug creation, no attachments to upload"
-                )
+            self._log_with_time("[blue]Finished bug creation, uploading attachments...")
 
     def is_finished(self) -> bool:
         """
@@ -435,59 +590,45 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
         if self.bug_creation_worker.state != WorkerState.SUCCESS:
             logger.debug("Bug creation worker not done")
             return False
-        if not all(w.is_finished for w in self.attachment_workers.values()):
+        if self.pending_collectors > 0:
             logger.debug("Some attachment collectors are still running")
             return False
-        if not all(w.is_finished for w in self.upload_workers.values()):
+        if self.pending_uploads > 0:
             logger.debug("Some attachment upload-ers are still running")
             return False
 
         return True
 
-    def _ready_to_upload_attachments(self) -> bool:
-        if self.bug_creation_worker is None:
-            logger.error("No bug creation worker, logic error")
-            return False
-        if self.bug_creation_worker.state != WorkerState.SUCCESS:
-            # explicitly check for success here
-            # because any failure in the bug creation worker
-            # will prompt the user to go back to the editor
-            logger.debug(
-                f"Bug creation worker hasn't finished: {self.bug_creation_worker.state}"
-            )
-            return False
-
-        if any(w.is_running for w in self.upload_workers.values()):
-            logger.debug("An upload worker is already running")
-            return False
-
-        if not all(w.is_finished for w in self.attachment_workers.values()):
-            logger.debug("Some attachment workers are not done")
-            return False
-
-        return True
-
     def watch_finished(self):
         if not self.finished:
             return
 
         # immediately hide the give up button
-        self.query_exactly_one("#give_up", Button).display = False
-        self.run_worker(self._actually_finish, thread=True)
+        assert self.give_up_button
+        self.give_up_button.display = False
+        self.run_worker(self._actually_finish)
 
     def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
-        if event.worker.state == WorkerState.CANCELLED:
+        if event.state == WorkerState.CANCELLED:
             self._log_with_time(f"[yellow]{event.worker.name} was cancelled[/]")
 
+        worker_name = event.worker.name
+
+        # use the state in the message, not the worker's current state
+        # otherwise a worker that finished quickly would be counted twice
+        if event.state in FINAL_WORKER_STATES:
+            if worker_name in self.collector_names:
+                self.pending_collectors -= 1
+            elif worker_name in self.upload_workers:
+                self.pending_uploads -= 1
+
         if self.finished:
             # don't do the following callbacks if finished
             return
 
-        worker_name = event.worker.name
-
         if worker_name == WorkerName.BUG_CREATION:
             self._bug_creation_worker_callback(event)
-        elif worker_name in self.attachment_workers:
+        elif worker_name in self.collector_names:
             self._attachment_worker_callback(event)
 
         self.finished = self.is_finished()
@@ -505,14 +646,23 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
             if worker.is_running:
                 self._log_with_time(f"Cancelling collector [b]{key}[/]")
                 worker.cancel()
-                self.attachment_worker_checker_timers[key].stop()
-                self.query_exactly_one("#progress", ProgressBar).advance()
 
         # nothing to give up, disable the button
         event.button.disabled = True
         event.button.label = "All collectors finished"
         event.button.styles.width = "auto"
 
+    def _expected_collector_steps(self) -> int:
+        """Progress bar steps taken by the collectors before they finish
+
+        Each collector is 1 step to collect and is assumed to produce 1 file.
+        Collectors only run in screen mode, the app mode uploads an existing
+        attachment dir.
+        """
+        if self.mode != "screen":
+            return 0
+        return len(self.bug_report.logs_to_include) * 2  # collect + upload
+
     @override
     def compose(self) -> ComposeResult:
         yield SimpleHeader()
@@ -520,9 +670,10 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
         with Center(classes="lrm1"):
             with HorizontalGroup(classes="w100 center"):
                 yield Label("Submission Progress", classes="mr1")
+                # initial guess, the real total is known once the files are
+                # queued for upload. see upload_finished_attachments
                 yield ProgressBar(
-                    total=self.submitter.steps
-                    + len(self.bug_report.logs_to_include) * 2,  # collect + upload
+                    total=self.submitter.steps + self._expected_collector_steps(),
                     id="progress",
                     show_eta=False,
                 )
@@ -565,13 +716,67 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
             yield Footer()
 
     def _log_with_time(self, msg: str):
-        if self.log_widget is None:
-            logger.warning("Uninitialized log widget")
-            return
-        # 999 seconds is about 2 hours
+        # 9999.9 seconds is about 2.7 hours
         # should be enough digits
-        s = f"{round(time.time() - self.progress_start_time, 1)}".rjust(6)
-        self.log_widget.write(f"[grey70][ {s} ][/] {msg}")
+        elapsed = time.monotonic() - self.progress_start_time
+        # most messages come from the collector/upload threads and widgets are
+        # not thread safe. Queue them up and let the UI thread write them
+        self.log_queue.put(f"[grey70][ {elapsed:6.1f} ][/] {msg}")
+
+    def _log_ok(self, tag: str, msg: str | None = None) -> None:
+        """Logs a green OK line
+
+        :param tag: what finished, shown in bold
+        :param msg: extra details, only shown if it's not empty/blank
+        """
+        if msg and (msg := msg.strip()):
+            self._log_with_time(f"[green]OK[/] [b]{tag}[/b]: {msg}")
+        else:
+            self._log_with_time(f"[green]OK[/] [b]{tag}[/b]")
+
+    def _log_fail(self, tag: str, e: BaseException) -> None:
+        """Logs a red FAIL line with the exception
+
+        :param tag: what failed
+        :param e: the exception, escaped since its repr can look like markup
+        """
+        self._log_with_time(f"[red]FAIL[/red] {tag}: {escape_markup(repr(e))}")
+
+    def _flush_ui_updates(self) -> None:
+        """Applies the queued logs and progress in 1 batch so the screen
+        only repaints once per tick
+        """
+        with self.app.batch_update():
+            self._flush_logs()
+            self._flush_progress()
+
+    def _flush_logs(self) -> None:
+        """Writes the queued messages to the log widget, at most
+        MAX_LOG_LINES_PER_FLUSH of them, the rest waits for the next tick.
+        This should only be called from the UI thread
+        """
+        assert self.log_widget
+        for _ in range(MAX_LOG_LINES_PER_FLUSH):
+            try:
+                # write them 1 by 1, a lot of messages don't close their tags
+                self.log_widget.write(self.log_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _advance_progress(self) -> None:
+        """Marks 1 step as finished. Safe to call from any thread"""
+        with self.pending_progress_lock:
+            self.pending_progress += 1
+
+    def _flush_progress(self) -> None:
+        """Applies all the pending steps to the progress bar in 1 update.
+        This should only be called from the UI thread
+        """
+        assert self.progress_bar
+        with self.pending_progress_lock:
+            steps, self.pending_progress = self.pending_progress, 0
+        if steps > 0:
+            self.progress_bar.advance(steps)
 
     def _bug_creation_worker_callback(self, event: Worker.StateChanged):
         if event.worker.name != WorkerName.BUG_CREATION:
@@ -579,13 +784,19 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                 f"This callback was used on {event.worker.name}, but expected {WorkerName.BUG_CREATION}"
             )
 
-        match event.worker.state:
+        match event.state:
             case WorkerState.ERROR:
-                for worker in self.attachment_workers.values():
-                    worker.cancel()
-
-                    if is_prod():
-                        shutil.rmtree(self.attachment_dir, ignore_errors=True)
+                self.workers.cancel_group(self, WorkerGroup.COLLECTORS)
+
+                # in app mode the dir belongs to bugit.submit's caller, keep it
+                if self.mode == "screen" and is_prod():
+                    # this is a message handler, don't block the UI
+                    # run it on the app, the screen may be dismissed before
+                    # the collectors stop and that would cancel its workers
+                    self.app.run_worker(
+                        self._remove_attachment_dir_after_collectors(),
+                        exit_on_error=False,
+                    )
 
                 match self.mode:
                     case "screen":
@@ -621,61 +832,50 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                         )
 
             case WorkerState.SUCCESS:
-                if self._ready_to_upload_attachments():
-                    self._launch_upload_workers()
+                self.upload_finished_attachments()
             case _:
                 pass
 
     def _attachment_worker_callback(self, event: Worker.StateChanged):
-        if event.worker.name not in self.attachment_workers:
+        if event.worker.name not in self.collector_names:
             raise ValueError(
                 f"This callback was used on {event.worker.name}, but it's not a log collector"
             )
 
-        match event.worker.state:
+        match event.state:
             case WorkerState.SUCCESS | WorkerState.CANCELLED:
-                if self._ready_to_upload_attachments():
-                    self._launch_upload_workers()
+                self.upload_finished_attachments()
             case WorkerState.ERROR:
                 self._log_with_time(
                     f"[red]Collector {event.worker.name} failed! {escape_markup(repr(event.worker.error))}"
                 )
+                # still upload whatever it managed to collect
+                self.upload_finished_attachments()
             case _:
                 pass
 
-    def _launch_upload_workers(self):
-        give_up_btn = self.query_exactly_one("#give_up", Button)
-        give_up_btn.disabled = True
-        give_up_btn.label = "All collectors finished"
-        give_up_btn.styles.width = "auto"
-
-        if self.submitter.allow_parallel_upload:
-            self.start_parallel_attachment_upload()
-        else:
-            self.start_sequential_attachment_upload()
-        self.upload_attempted = True
-
-        progress_bar = self.query_exactly_one("#progress", ProgressBar)
-        progress_bar.total = (
-            self.submitter.steps
-            + len(self.attachment_workers)
-            + len(self.upload_workers)
-        )
+    def _finalize(self) -> bool:
+        """Runs the submitter's finalize step and logs the result.
+        This talks to the server, don't call it in the UI thread
 
-    def _actually_finish(self):
+        :return: whether finalize succeeded
+        """
         try:
             rv = self.submitter.finalize()
-            finalize_ok = True
             if rv:
                 self._log_with_time(f"[green]FINALIZE OK[/] {rv}")
             else:
                 self._log_with_time(
                     f"[green]FINALIZE OK[/] {self.submitter.display_name}"
                 )
+            return True
         except Exception as e:
-            finalize_ok = False
-            self._log_with_time(f"[red]ERR when finalizing[/]: {repr(e)}")
+            self._log_with_time(f"[red]ERR when finalizing[/]: {escape_markup(repr(e))}")
             logger.error(e)
+            return False
+
+    async def _actually_finish(self):
+        finalize_ok = await asyncio.to_thread(self._finalize)
 
         finish_message_lines = ["[green]Submission finished![/]"]
 
@@ -683,27 +883,18 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
             w.state == WorkerState.SUCCESS for w in self.upload_workers.values()
         )
         if all_upload_ok and finalize_ok:
-            # only cleanup if everything was uploaded
             finish_message_lines.insert(
                 1,
                 f"URL: [$primary]{self.submitter.bug_url}[/]",
             )
-            if is_prod():
-                shutil.rmtree(self.attachment_dir, ignore_errors=True)
 
         if not (all_upload_ok and finalize_ok) and self.attachment_dir.exists():
-            if is_snap():
-                attachment_dir = (
-                    "/tmp/snap-private-tmp/snap.bugit-v2/tmp" / self.attachment_dir
-                )
-            else:
-                attachment_dir = self.attachment_dir
             finish_message_lines.insert(
                 1,
                 "\n".join(
                     [
                         "[red]But some files failed to upload.[/]",
-                        f"[red]You can manually reupload the files at: {attachment_dir}[/]",
+                        f"[red]You can manually reupload the files at: {self.host_attachment_dir}[/]",
                     ]
                 ),
             )
@@ -713,7 +904,40 @@ class SubmissionProgressScreen[TAuth](Screen[ReturnScreenChoice]):
                 "You can go back to job/session selection or quit BugIt."
             )
 
-        self.query_exactly_one("#finish_message", Label).update(
-            "\n".join(finish_message_lines)
-        )
-        self.query_exactly_one("#menu_after_finish").display = True
+        # back on the UI thread here, the widgets can be updated directly
+        assert self.finish_message and self.menu_after_finish
+        self.finish_message.update("\n".join(finish_message_lines))
+        self.menu_after_finish.display = True
+
+        # the bundles are only copies, the originals stay in attachment_dir
+        await asyncio.to_thread(self._remove_bundle_dir)
+        # only cleanup if everything was uploaded
+        # after the menu is shown so a big dir doesn't hold it back
+        if all_upload_ok and finalize_ok and is_prod():
+            await asyncio.to_thread(self._remove_attachment_dir)
+
+    async def _remove_attachment_dir_after_collectors(self) -> None:
+        """Waits for the (cancelled) collectors to stop, then deletes the
+        attachment dir. Otherwise a collector that hasn't processed the
+        cancellation yet could still be writing into the dir being deleted.
+        The collectors that write from a thread only finish after that thread
+        returns, see _to_thread_until_done in log_collectors
+        """
+        for worker in self.attachment_workers.values():
+            try:
+                await worker.wait()
+            except WorkerError:
+                pass  # cancelled or failed, either way it's not writing anymore
+        await asyncio.to_thread(self._remove_attachment_dir)
+
+    def _remove_attachment_dir(self) -> None:
+        """Deletes the attachment dir and everything in it
+
+        This can take a while if the logs are big, don't call it in the UI thread
+        """
+        shutil.rmtree(self.attachment_dir, ignore_errors=True)
+
+    def _remove_bundle_dir(self) -> None:
+        """Deletes the small file bundles, if any were made"""
+        if self.bundle_dir is not None:
+            shutil.rmtree(self.bundle_dir, ignore_errors=True)
@@ -4,10 +4,10 @@ Generates the "Additional Information" section from the bug report
 
 import asyncio
 import json
+import sys
 from typing import Annotated
 
 import typer
-from rich import print as rich_print
 
 from bugit_v2.dut_utils.info_getters import get_standard_info
 from bugit_v2.models.dut_info import get_saved_dut_info
@@ -48,14 +48,15 @@ def main(
             info["SKU"] = saved_dut_info.sku
 
     if print_json:
-        out = {}
-        for key in info:
-            out[
-                "_".join(word.strip().lower() for word in key.split() if word.strip())
-            ] = info[key]
-
-        print(json.dumps(out))
+        # split() already drops the empty words
+        out = {"_".join(key.lower().split()): v for key, v in info.items()}
+        # write straight to stdout, no need to build the whole string first
+        json.dump(out, sys.stdout)
+        print()
     else:
+        # rich is only needed for the colored output, don't load it for --json
+        from rich import print as rich_print
+
         for key, v in info.items():
             rich_print(f"[yellow]{key}[/]: [bold white]{v}")
 
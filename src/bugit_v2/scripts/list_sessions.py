@@ -1,9 +1,10 @@
 import json
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sys import stderr
+from sys import stderr, stdout
 
 import typer
-from rich import print as rich_print
 from typing_extensions import Annotated
 
 from bugit_v2.checkbox_utils.checkbox_session import (
@@ -13,6 +14,8 @@ from bugit_v2.checkbox_utils.checkbox_session import (
 from bugit_v2.utils import is_prod, is_snap
 
 SESSION_ROOT_DIR = Path("/var/tmp/checkbox-ng/sessions")
+# up to this many sessions are read one by one without a thread pool
+MAX_SERIAL_SESSIONS = 2
 
 
 app = typer.Typer(
@@ -24,6 +27,36 @@ app = typer.Typer(
 )
 
 
+def read_session(session_path: Path) -> CheckboxSession | Exception:
+    """Reads the session, returns the error instead of raising it
+
+    :param session_path: path to the session dir
+    """
+    try:
+        return CheckboxSession(session_path)
+    except Exception as e:
+        return e
+
+
+def read_sessions(
+    session_paths: Sequence[Path],
+) -> Iterator[CheckboxSession | Exception]:
+    """Reads the sessions in the given order, see read_session
+
+    :param session_paths: paths to the session dirs
+    """
+    if len(session_paths) <= MAX_SERIAL_SESSIONS:
+        # starting a pool costs more than it saves for just a few sessions
+        yield from map(read_session, session_paths)
+        return
+
+    # each session file has to be decompressed to find the test plan
+    # read them at the same time, map() keeps the original order and
+    # hands back each session as soon as it (and the ones before it) are read
+    with ThreadPoolExecutor(max_workers=min(32, len(session_paths))) as executor:
+        yield from executor.map(read_session, session_paths)
+
+
 @app.command(
     help="Print the info in a human-friendly format. Pipe the output to 'cat' to remove colors.",
 )
@@ -38,40 +71,50 @@ def main(
         if print_json:
             print("[]")
         else:
+            from rich import print as rich_print
+
             rich_print("[red]No sessions were found on this device")
         exit()
 
+    sessions = read_sessions(valid_sessions)
+
     if print_json:
-        d: list[dict[str, str]] = []
-        for session_path in valid_sessions:
-            try:
-                session = CheckboxSession(session_path)
-            except Exception as e:
-                print(repr(e), file=stderr)
+        # write the list item by item so the output starts early
+        # and doesn't have to be built in memory first
+        separator = ""
+        stdout.write("[")
+        for session_path, session in zip(valid_sessions, sessions):
+            if isinstance(session, Exception):
+                print(repr(session), file=stderr)
                 continue
-            d.append(
+            stdout.write(separator)
+            json.dump(
                 {
                     "session_path": str(session_path),
                     "test_plan": session.testplan_id,
-                }
+                },
+                stdout,
             )
-        print(json.dumps(d))
-    else:
-        for idx, session_path in enumerate(valid_sessions):
-            try:
-                session = CheckboxSession(session_path)
-            except Exception as e:
-                rich_print(
-                    f"This session [red]{session_path}[/] doesn't seem valid because of this error:",
-                    file=stderr,
-                )
-                print(f"  {repr(e)}", file=stderr)
-                continue
-            rich_print(f"[yellow]Session directory[/]: [bold white]{session_path}")
-            rich_print(f"[yellow]Test Plan[/]: [bold white]{session.testplan_id}")
-            if idx != len(valid_sessions) - 1:
-                # print a separator if not the last one
-                print()
+            separator = ", "
+        stdout.write("]\n")
+        return
+
+    # rich is only needed for the colored output, don't load it for --json
+    from rich import print as rich_print
+
+    for idx, (session_path, session) in enumerate(zip(valid_sessions, sessions)):
+        if isinstance(session, Exception):
+            rich_print(
+                f"This session [red]{session_path}[/] doesn't seem valid because of this error:",
+                file=stderr,
+            )
+            print(f"  {repr(session)}", file=stderr)
+            continue
+        rich_print(f"[yellow]Session directory[/]: [bold white]{session_path}")
+        rich_print(f"[yellow]Test Plan[/]: [bold white]{session.testplan_id}")
+        if idx != len(valid_sessions) - 1:
+            # print a separator if not the last one
+            print()
 
 
 if __name__ == "__main__":
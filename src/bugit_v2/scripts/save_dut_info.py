@@ -1,3 +1,5 @@
+import os
+
 import typer
 from pydantic import ValidationError
 from rich import print as rich_print
@@ -90,7 +92,7 @@ def show(
         print(info.model_dump_json())
     else:
         for key, v in dict(info).items():
-            pretty_key = " ".join([w.title() for w in key.split("_")])
+            pretty_key = key.replace("_", " ").title()
             rich_print(f"[yellow]{pretty_key}[/]: [bold white]{v}")
 
 
@@ -206,15 +208,12 @@ def main(
             tags=tags,
         )
         if old_info:
-            old_info_dict = dict(old_info)
-            for k, v in dict(new_info).items():
-                if v:  # include None and empty list
-                    old_info_dict[k] = v
-            with open(INFO_FILE, "w") as f:
-                f.write(DutInfo.model_validate(old_info_dict).model_dump_json())
+            old_info_dict = old_info.model_dump()
+            # skip None and empty lists so they don't erase the old values
+            old_info_dict.update({k: v for k, v in new_info.model_dump().items() if v})
+            payload = DutInfo.model_validate(old_info_dict).model_dump_json()
         else:
-            with open(INFO_FILE, "w") as f:
-                f.write(new_info.model_dump_json())
+            payload = new_info.model_dump_json()
     except ValidationError as e:
         rich_print(f"[red]Found {e.error_count()} validation errors")
         for idx, err in enumerate(e.errors()):
@@ -226,6 +225,12 @@ def main(
                 print()
         raise SystemExit(1)
 
+    # only touch the file once the payload is valid, then swap it in
+    # so a failed write never leaves the old info truncated
+    tmp_file = INFO_FILE.with_suffix(".json.tmp")
+    tmp_file.write_text(payload)
+    os.replace(tmp_file, INFO_FILE)
+
 
 if __name__ == "__main__":
     app(prog_name="bugit.dut-info" if is_snap() else "bugit-dut-info")
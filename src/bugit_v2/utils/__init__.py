@@ -1,24 +1,32 @@
 import datetime as dt
 import importlib.metadata
 import os
+import re
 import shutil
-import string
+from functools import lru_cache
 
 from bugit_v2.utils.constants import HOST_FS
 
 
-_VALID_CHARS = frozenset(f"-_.{string.ascii_letters}{string.digits}")
+# anything that is not in checkbox's set of valid chars "-_.a-zA-Z0-9"
+_INVALID_CHARS_PATTERN = re.compile(r"[^-_.a-zA-Z0-9]")
+_SECONDS_IN_HOUR = 3600
 
 
+# the environment and the host don't change while bugit is running
+# so the checks below are only done once
+@lru_cache
 def is_prod() -> bool:
     """Is bugit in a prod environment?"""
     return os.getenv("DEBUG") != "1"
 
 
+@lru_cache
 def is_snap() -> bool:
     return "SNAP" in os.environ
 
 
+@lru_cache
 def host_is_ubuntu_core() -> bool:
     if shutil.which("apt") is not None:
         return False
@@ -27,29 +35,36 @@ def host_is_ubuntu_core() -> bool:
     return not apt_path.exists() or not apt_path.is_file()
 
 
+@lru_cache
 def get_bugit_version() -> str:
     return importlib.metadata.version("bugit-v2")
 
 
-def pretty_date(d: dt.datetime) -> str:
-    diff = dt.datetime.now() - d
+def pretty_date(d: dt.datetime, now: dt.datetime | None = None) -> str:
+    """Describe how long ago d was in a human-friendly way
+
+    :param d: the datetime to describe
+    :param now: the reference time, pass the same one when formatting many
+        dates at once. Defaults to the current time
+    """
+    diff = (now or dt.datetime.now()) - d
     s = diff.seconds
     if diff.days > 7 or diff.days < 0:
         return d.strftime("%d %b %y")
     elif diff.days == 1:
         return "1 day ago"
     elif diff.days > 1:
-        return f"{diff.days} days {diff.seconds//3600} hours ago"
+        return f"{diff.days} days {s // _SECONDS_IN_HOUR} hours ago"
     elif s <= 1:
         return "just now"
     elif s < 60:
         return f"{s} seconds ago"
-    elif s < 3600:
-        return "{:.2f} minutes ago".format(s / 60)
-    elif s < 7200:
+    elif s < _SECONDS_IN_HOUR:
+        return f"{s / 60:.2f} minutes ago"
+    elif s < 2 * _SECONDS_IN_HOUR:
         return "1 hour ago"
     else:
-        return "{:.2f} hours ago".format(s / 3600)
+        return f"{s / _SECONDS_IN_HOUR:.2f} hours ago"
 
 
 def slugify(s: str) -> str:
@@ -59,4 +74,4 @@ def slugify(s: str) -> str:
     :return: a clean string for filenames
     """
 
-    return "".join(char if char in _VALID_CHARS else "_" for char in s)
+    return _INVALID_CHARS_PATTERN.sub("_", s)
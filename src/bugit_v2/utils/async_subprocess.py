@@ -1,14 +1,15 @@
 import asyncio
 import asyncio.subprocess as asp
+import contextlib
 import logging
+import os
+import signal
 from pathlib import Path
 import subprocess as sp
-from collections.abc import MutableMapping, Sequence
+from collections.abc import Mapping, MutableMapping, Sequence
 from subprocess import CalledProcessError
 from typing import IO, AnyStr, Literal
 
-import psutil
-
 logger = logging.getLogger(__name__)
 
 
@@ -27,35 +28,11 @@ async def asp_check_output(
     :raises CalledProcessError: when the process doesn't return 0
     :return: stdout as a string if successful
     """
-    if env:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=asp.PIPE, stderr=asp.PIPE, env=env, cwd=cwd
-        )
-    else:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=asp.PIPE, stderr=asp.PIPE, cwd=cwd
-        )
-
-    try:
-        if timeout:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
-        else:
-            stdout, stderr = await proc.communicate()
-    except asyncio.TimeoutError as e:
-        if proc.returncode is None:
-            logger.error(f"Force killing process {proc.pid}, cmd='{cmd}' (timed out)")
-            recursive_kill(proc.pid)
-        raise e
-    except asyncio.CancelledError as e:
-        if proc.returncode is None:
-            logger.warning(f"Force killing process {proc.pid}, cmd='{cmd}' (cancelled)")
-            recursive_kill(proc.pid)
-        raise e
-
-    assert proc.returncode is not None
-    if proc.returncode != 0:
-        raise CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    rc, stdout, stderr = await _spawn_and_wait(cmd, timeout, env, cwd)
+    if rc != 0:
+        raise CalledProcessError(rc, cmd, stdout, stderr)
 
+    assert stdout is not None
     return stdout.decode()
 
 
@@ -78,31 +55,7 @@ async def asp_check_call(
     :raises CalledProcessError: when return code is not 0
     :return: 0
     """
-    if env:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=stdout, stderr=stderr, env=env, cwd=cwd
-        )
-    else:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=stdout, stderr=stderr, cwd=cwd
-        )
-
-    try:
-        if timeout:
-            rc = await asyncio.wait_for(proc.wait(), timeout)
-        else:
-            rc = await proc.wait()
-    except asyncio.TimeoutError as e:
-        if proc.returncode is None:
-            logger.error(f"Force killing process {proc.pid}, cmd='{cmd}' (timed out)")
-            recursive_kill(proc.pid)
-        raise e
-    except asyncio.CancelledError as e:
-        if proc.returncode is None:
-            logger.warning(f"Force killing process {proc.pid}, cmd='{cmd}' (cancelled)")
-            recursive_kill(proc.pid)
-        raise e
-
+    rc, _, _ = await _spawn_and_wait(cmd, timeout, env, cwd, stdout, stderr)
     if rc != 0:
         raise CalledProcessError(rc, cmd)
 
@@ -123,47 +76,86 @@ async def asp_run(
     :param cwd: override current working directory
     :return: stdout as a string if successful
     """
-    if env:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=asp.PIPE, stderr=asp.PIPE, env=env, cwd=cwd
-        )
-    else:
-        proc = await asp.create_subprocess_exec(
-            *cmd, stdout=asp.PIPE, stderr=asp.PIPE, cwd=cwd
-        )
+    rc, stdout, stderr = await _spawn_and_wait(cmd, timeout, env, cwd)
+    assert stdout is not None and stderr is not None
+
+    return sp.CompletedProcess[str](cmd, rc, stdout.decode(), stderr.decode())
+
+
+async def _spawn_and_wait(
+    cmd: Sequence[str],
+    timeout: int | None,
+    env: Mapping[str, str] | None,
+    cwd: str | Path | None,
+    stdout: IO[AnyStr] | int = asp.PIPE,
+    stderr: IO[AnyStr] | int = asp.PIPE,
+) -> tuple[int, bytes | None, bytes | None]:
+    """Run cmd in its own process group and wait for it to finish.
+    The whole group is killed if it times out or gets cancelled
+
+    :param cmd: command array
+    :param timeout: timeout in seconds. Wait forever if None or 0
+    :param env: env override, an empty one inherits the current env
+    :param cwd: override current working directory
+    :param stdout: where to put stdout, captured by default
+    :param stderr: where to put stderr, captured by default
+    :return: (return code, stdout, stderr), the outputs are None if not captured
+    """
+    proc = await asp.create_subprocess_exec(
+        *cmd,
+        stdout=stdout,
+        stderr=stderr,
+        env=env or None,
+        cwd=cwd,
+        start_new_session=True,
+    )
 
     try:
-        if timeout:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
-        else:
-            stdout, stderr = await proc.communicate()
+        # no extra task like wait_for, None means no deadline
+        async with asyncio.timeout(timeout or None):
+            out, err = await proc.communicate()
     except asyncio.TimeoutError as e:
         if proc.returncode is None:
             logger.error(f"Force killing process {proc.pid}, cmd='{cmd}' (timed out)")
             recursive_kill(proc.pid)
+            await _reap(proc)
         raise e
     except asyncio.CancelledError as e:
         if proc.returncode is None:
             logger.warning(f"Force killing process {proc.pid}, cmd='{cmd}' (cancelled)")
             recursive_kill(proc.pid)
+            await _reap(proc)
         raise e
 
     assert proc.returncode is not None
-
-    return sp.CompletedProcess[str](
-        cmd, proc.returncode, stdout.decode(), stderr.decode()
-    )
+    return proc.returncode, out, err
 
 
 def recursive_kill(pid: int):
-    try:
-        parent = psutil.Process(pid)
+    """Kill the process and everything it spawned
 
-        for child in parent.children(recursive=True):
-            child.kill()
+    The helpers above start the processes with start_new_session=True, so pid is
+    also the id of their process group. One killpg reaches the whole tree,
+    including orphans whose parent already exited
 
-        parent.kill()
-    except psutil.NoSuchProcess:
+    :param pid: pid of a process started by the functions above
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
         logger.warning(f"No such process: {pid}")
     except PermissionError as e:
         logger.warning(f"Permission error when killing {pid}: {e}")
+
+
+async def _reap(proc: asp.Process) -> None:
+    """Briefly wait for a killed process
+
+    Without this the process stays a zombie and its pipes stay open until
+    the transport is garbage collected
+
+    :param proc: the process that was just killed
+    """
+    with contextlib.suppress(TimeoutError):
+        async with asyncio.timeout(1):
+            await proc.wait()
@@ -80,22 +80,16 @@ VENDOR_MAP: Mapping[str, tuple[str, ...]] = {
 }
 
 
-AUTOSAVE_DIR = (
-    Path(os.getenv("SNAP_USER_DATA", str(Path().home().absolute() / ".cache")))
-    / "bugit-v2-autosave"
-)
+# only look up the home dir once for all the fallbacks below
+_HOME = Path.home().absolute()
+AUTOSAVE_DIR = Path(os.getenv("SNAP_USER_DATA", _HOME / ".cache")) / "bugit-v2-autosave"
 VISUAL_CONFIG_DIR = (
-    Path(os.getenv("SNAP_USER_DATA", str(Path().home().absolute() / ".config")))
-    / "bugit-v2-visual-config"
-)
-DUT_INFO_DIR = (
-    Path(os.getenv("SNAP_USER_DATA", str(Path().home().absolute() / ".config")))
-    / "bugit-v2-dut-info"
+    Path(os.getenv("SNAP_USER_DATA", _HOME / ".config")) / "bugit-v2-visual-config"
 )
+DUT_INFO_DIR = Path(os.getenv("SNAP_USER_DATA", _HOME / ".config")) / "bugit-v2-dut-info"
 HOST_FS = Path("/var/lib/snapd/hostfs")
 DISK_CACHE_DIR = (
-    Path(os.getenv("SNAP_COMMON", str(Path().home().absolute() / ".cache")))
-    / "bugit-v2-persistent-cache"
+    Path(os.getenv("SNAP_COMMON", _HOME / ".cache")) / "bugit-v2-persistent-cache"
 )
 
 MAX_JOB_OUTPUT_LEN = 3000
@@ -1,6 +1,7 @@
 import os
 import re
 import subprocess as sp
+from functools import lru_cache
 from pathlib import Path
 
 import pydantic
@@ -15,7 +16,10 @@ from bugit_v2.utils.constants import (
     NullSelection,
 )
 
+_CID_PATTERN = re.compile(r"\d{6}-\d{5}\b")
 
+
+@lru_cache
 def bugit_is_in_devmode() -> bool:
     # technically bugit won't even install if --devmode is not specified
     # because of the sudoer hook
@@ -69,7 +73,7 @@ def checkbox_submission_check(checkbox_submission: Path | None):
 
 
 def is_cid(cid: str) -> bool:
-    return re.compile(r"\d{6}-\d{5}\b").fullmatch(cid) is not None
+    return _CID_PATTERN.fullmatch(cid) is not None
 
 
 def ensure_all_directories_exist() -> None:
@@ -79,4 +83,5 @@ def ensure_all_directories_exist() -> None:
         DUT_INFO_DIR,
         DISK_CACHE_DIR,
     ):
-        os.makedirs(directory, exist_ok=True)
+        # tries mkdir first, only stats when the dir is already there
+        directory.mkdir(parents=True, exist_ok=True)